@@ -7,7 +7,7 @@ from typing_extensions import Self, assert_never, override
 from pybt2.runtime.analysis import SupportsAnalysis
 from pybt2.runtime.fibre import CallContext, Fibre, FibreNode
 from pybt2.runtime.function_call import RuntimeCallableProps
-from pybt2.runtime.tree_position import ReturnTreePosition, TreePosition
+from pybt2.runtime.tree_position import ReturnTreePosition, ReturnTreePositionState, TreePosition
 from pybt2.runtime.types import (
     CaptureKey,
     FibreNodeFunction,
@@ -92,7 +92,8 @@ class UnorderedCaptureProvider(
         )
         child_node = ctx.get_last_child()
 
-        capture_consumer_result = ctx.fibre.run(capture_consumer_node, CaptureConsumer[T]())
+        capture_consumer: CaptureConsumer[T] = CaptureConsumer()
+        capture_consumer_result = ctx.fibre.run(capture_consumer_node, capture_consumer)
         return FibreNodeState(
             props=self,
             result=(child_result.result, capture_consumer_result.result),
@@ -107,7 +108,7 @@ class TreePositionCalculator:
     tree_position_root: FibreNode
     capture_providers: Set[FibreNode]
     return_tree_positions: dict[
-        FibreNode, tuple[FibreNode[ReturnTreePosition, TreePosition, None, None], TreePosition]
+        FibreNode, tuple[FibreNode[ReturnTreePosition, TreePosition, ReturnTreePositionState, None], TreePosition]
     ] = Factory(dict)
     key_slice_start: int = Factory(lambda self: len(self.tree_position_root.key_path) - 1, takes_self=True)
 
@@ -122,13 +123,13 @@ class TreePositionCalculator:
 
     def get_tree_position_node(
         self, ctx: CallContext, fibre_node: FibreNode
-    ) -> tuple[FibreNode[ReturnTreePosition, TreePosition, None, None], TreePosition]:
+    ) -> tuple[FibreNode[ReturnTreePosition, TreePosition, ReturnTreePositionState, None], TreePosition]:
         if (result := self.return_tree_positions.get(fibre_node)) is not None:
             return result
 
         parent = fibre_node.parent
         return_tree_position: ReturnTreePosition
-        parent_tree_position_node: Optional[FibreNode["ReturnTreePosition", TreePosition, None, None]]
+        parent_tree_position_node: Optional[FibreNode[ReturnTreePosition, TreePosition, ReturnTreePositionState, None]]
         if parent is self.tree_position_root:
             parent_tree_position_node = None
         elif parent is None:  # pragma: no cover
@@ -141,7 +142,9 @@ class TreePositionCalculator:
             key="/".join(str(key) for key in itertools.islice(fibre_node.key_path, self.key_slice_start, None)),
         )
         tree_position = ctx.evaluate_child(return_tree_position)
-        tree_position_node = cast(FibreNode[ReturnTreePosition, TreePosition, None, None], ctx.get_last_child())
+        tree_position_node = cast(
+            "FibreNode[ReturnTreePosition, TreePosition, ReturnTreePositionState, None]", ctx.get_last_child()
+        )
         self.return_tree_positions[fibre_node] = (tree_position_node, tree_position)
 
         return tree_position_node, tree_position
@@ -157,21 +160,17 @@ class OrderedCaptureProvider(RuntimeCallableProps[tuple[ResultT, Sequence[T]]],
     def __call__(self, ctx: CallContext) -> tuple[ResultT, Sequence[T]]:
         if self.analysis_mode:
             return self.evaluate_in_analysis_mode(ctx)
-        child_result, capture_results = ctx.evaluate_child(
-            UnorderedCaptureProvider[ResultT, T](self.capture_key, self.child)
-        )
+        child_result, capture_results = ctx.evaluate_child(UnorderedCaptureProvider(self.capture_key, self.child))
         tree_position_root = ctx.get_last_child()
 
         tree_positions = TreePositionCalculator(
-            tree_position_root, cast(Set[FibreNode], capture_results.keys())
+            tree_position_root, cast("Set[FibreNode]", capture_results.keys())
         ).get_tree_positions(ctx)
 
         return child_result, [capture_results[fibre_node] for _, fibre_node in sorted(tree_positions.items())]
 
     def evaluate_in_analysis_mode(self, ctx: CallContext) -> tuple[ResultT, Sequence[T]]:
-        child_result, capture_results = ctx.evaluate_child(
-            UnorderedCaptureProvider[ResultT, T](self.capture_key, self.child)
-        )
+        child_result, capture_results = ctx.evaluate_child(UnorderedCaptureProvider(self.capture_key, self.child))
         # order doesn't matter for analysis. The main thing is dropping all of the ReturnTreePosition nodes
         return child_result, [*capture_results.values()]
 
@@ -229,7 +228,7 @@ class CaptureValue(FibreNodeFunction[T, CaptureValueState[T], None], Generic[T])
 
 def use_capture(ctx: CallContext, capture_key: CaptureKey[T], value: T, key: Optional[Key] = None) -> None:
     capture_consumer_fibre_node = cast(
-        FibreNode[CaptureConsumer, Mapping[FibreNode, T], None, CaptureEntryAction[T]],
+        "FibreNode[CaptureConsumer, Mapping[FibreNode, T], None, CaptureEntryAction[T]]",
         ctx.fibre_node.contexts[capture_key],
     )
     ctx.evaluate_child(CaptureValue(capture_consumer_fibre_node, value), key=key)
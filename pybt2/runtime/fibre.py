@@ -1,14 +1,16 @@
+import heapq
 import itertools
+import operator
 from abc import ABCMeta, abstractmethod
-from collections import deque
+from types import MappingProxyType
 from typing import (
     Any,
-    ChainMap,
+    Callable,
+    Container,
     Generic,
     Iterable,
     Iterator,
     Mapping,
-    MutableMapping,
     MutableSequence,
     Optional,
     Protocol,
@@ -23,7 +25,7 @@ from typing_extensions import override
 
 from pybt2.runtime import static_configuration
 from pybt2.runtime.exceptions import ChildAlreadyExistsError, PropsTypeConflictError
-from pybt2.runtime.instrumentation import FibreInstrumentation, NoOpFibreInstrumentation
+from pybt2.runtime.instrumentation import NO_OP_FIBRE_INSTRUMENTATION, FibreInstrumentation
 from pybt2.runtime.types import (
     NO_CHILDREN,
     NO_PREDECESSORS,
@@ -40,35 +42,50 @@ from pybt2.runtime.types import (
 _EMPTY_ITERATOR: Iterator[Any] = iter(())
 
 
-def _get_fibre_node_key_path(fibre_node: "FibreNode") -> KeyPath:
-    if fibre_node.parent is None:
-        return (fibre_node.key,)
-    else:
-        return *fibre_node.parent.key_path, fibre_node.key
+# Sequences of fibre nodes up to this length are scanned for membership rather than copied into a set. Most nodes have
+# only a handful of predecessors or children, and a scan of a short tuple is cheaper than building a set.
+_SMALL_LOOKUP_SIZE = 4
 
 
-def _get_contexts(fibre_node: Optional["FibreNode"]) -> ChainMap[Any, "FibreNode"]:
-    return fibre_node.contexts if fibre_node is not None else ChainMap[Any, "FibreNode"]()
+def _create_lookup(fibre_nodes: Sequence["FibreNode"]) -> Container["FibreNode"]:
+    return fibre_nodes if len(fibre_nodes) <= _SMALL_LOOKUP_SIZE else frozenset(fibre_nodes)
 
 
-def _get_parent_contexts(fibre_node: "FibreNode") -> ChainMap[Any, "FibreNode"]:
-    return _get_contexts(fibre_node.parent)
+def _freeze_fibre_nodes(
+    fibre_nodes: Sequence["FibreNode"], previous_fibre_nodes: Sequence["FibreNode"]
+) -> Sequence["FibreNode"]:
+    # Reuse the previous sequence when nothing has changed so that FibreNode.run can detect that by identity
+    if len(fibre_nodes) == len(previous_fibre_nodes) and all(map(operator.is_, fibre_nodes, previous_fibre_nodes)):
+        return previous_fibre_nodes
+    return tuple(fibre_nodes)
 
 
-@frozen(weakref_slot=False)
-class FibreNodeExecutionToken(Generic[UpdateT]):
-    dependencies_version: int
-    _enqueued_updates: Optional[list[UpdateT]]
-    enqueued_updates_stop: int
+def _get_fibre_node_depth(fibre_node: "FibreNode") -> int:
+    return fibre_node.parent.depth + 1 if fibre_node.parent is not None else 0
+
+
+# Shared by every node without contexts, so it is read-only
+_NO_CONTEXTS: Mapping[Any, "FibreNode"] = MappingProxyType({})
 
-    def get_enqueued_updates(self) -> Iterator[UpdateT]:
-        if self._enqueued_updates is None:
-            return _EMPTY_ITERATOR
-        else:
-            return itertools.islice(self._enqueued_updates, self.enqueued_updates_stop)
+
+def _derive_contexts(
+    parent: Optional["FibreNode"], context_overrides: Optional[Mapping[Any, "FibreNode"]]
+) -> Mapping[Any, "FibreNode"]:
+    parent_contexts = parent.contexts if parent is not None else _NO_CONTEXTS
+    if not context_overrides:
+        # Contexts are never mutated in place, so they can be shared with the parent
+        return parent_contexts
+    return {**parent_contexts, **context_overrides}
+
+
+def _get_fibre_node_contexts(fibre_node: "FibreNode") -> Mapping[Any, "FibreNode"]:
+    return _derive_contexts(fibre_node.parent, fibre_node._context_overrides)
 
 
 class CallContext(metaclass=ABCMeta):
+    # An empty __slots__ so that subclasses declaring slots don't also get a per-instance __dict__
+    __slots__ = ()
+
     @property
     @abstractmethod
     def fibre(self) -> "Fibre":
@@ -125,7 +142,7 @@ class CallContext(metaclass=ABCMeta):
         ...
 
 
-@mutable(eq=False, weakref_slot=False)
+@mutable(eq=False, slots=True, weakref_slot=False)
 class DefaultCallContext(CallContext):
     fibre: "Fibre"
     fibre_node: "FibreNode"
@@ -133,6 +150,10 @@ class DefaultCallContext(CallContext):
     _pointer: int = 0
     _current_predecessors: Optional[MutableSequence["FibreNode"]] = None
     _current_children: Optional[MutableSequence["FibreNode"]] = None
+    # Indexes over the children by key, so that finding a child is O(1) rather than a scan. Where keys are duplicated
+    # (only possible for automatically generated keys), the first child with that key is indexed.
+    _previous_children_by_key: Optional[dict[Key, "FibreNode"]] = None
+    _current_children_by_key: Optional[dict[Key, "FibreNode"]] = None
 
     @override
     def add_predecessor(self, fibre_node: "FibreNode") -> None:
@@ -146,26 +167,10 @@ class DefaultCallContext(CallContext):
             self._current_children = [fibre_node]
         else:
             self._current_children.append(fibre_node)
-
-    def _validate_child_key_is_unique(self, key: Key) -> None:
-        if self._current_children is None:
-            return
-        for child in self._current_children:
-            if child.key == key:
-                raise ChildAlreadyExistsError(key, existing_child=child)
-
-    def _next_child_key(self, optional_key: Optional[Key]) -> Key:
-        if optional_key is not None:
-            self._validate_child_key_is_unique(optional_key)
-        self._pointer += 1
-        return optional_key if optional_key is not None else self._pointer
-
-    def _get_previous_child_with_key(self, key: Key) -> Optional["FibreNode"]:
-        if self._previous_state is not None:
-            for child in self._previous_state.children:
-                if child.key == key:
-                    return child
-        return None
+        if self._current_children_by_key is None:
+            self._current_children_by_key = {fibre_node.key: fibre_node}
+        else:
+            self._current_children_by_key.setdefault(fibre_node.key, fibre_node)
 
     @override
     def get_child_fibre_node(
@@ -174,22 +179,38 @@ class DefaultCallContext(CallContext):
         key: Optional[Key] = None,
         additional_contexts: Optional[Mapping[Any, "FibreNode"]] = None,
     ) -> "FibreNode[FibreNodeFunction[ResultT, StateT, UpdateT], ResultT, StateT, UpdateT]":
-        child_key = self._next_child_key(key)
-        previous_child_fibre_node: Optional[FibreNode] = self._get_previous_child_with_key(child_key)
+        # This is called for every child on every evaluation, so key allocation, the uniqueness check and the lookup of
+        # the previous child are all done inline.
+        self._pointer += 1
+        if key is None:
+            child_key: Key = self._pointer
+        else:
+            child_key = key
+            if (
+                self._current_children_by_key is not None
+                and (existing_child := self._current_children_by_key.get(child_key)) is not None
+            ):
+                raise ChildAlreadyExistsError(child_key, existing_child=existing_child)
+
+        previous_children_by_key = self._previous_children_by_key
+        if previous_children_by_key is None and self._previous_state is not None:
+            # Built in reverse so that the first child with a given key wins
+            previous_children_by_key = self._previous_children_by_key = {
+                child.key: child for child in reversed(self._previous_state.children)
+            }
+        previous_child_fibre_node: Optional[FibreNode] = (
+            previous_children_by_key.get(child_key) if previous_children_by_key is not None else None
+        )
         if previous_child_fibre_node is not None and previous_child_fibre_node.props_type is props_type:
-            if additional_contexts is not None:
-                # In case the context has changed from the previous iteration
-                previous_child_fibre_node.contexts.clear()
-                previous_child_fibre_node.contexts.update(additional_contexts)
+            # In case the context has changed from the previous iteration
+            previous_child_fibre_node.set_context_overrides(additional_contexts)
             return previous_child_fibre_node
         else:
             return FibreNode(
                 key=child_key,
                 parent=self.fibre_node,
                 props_type=props_type,
-                contexts=self.fibre_node.contexts.new_child(cast(MutableMapping[Any, FibreNode], additional_contexts))
-                if additional_contexts is not None
-                else self.fibre_node.contexts,
+                context_overrides=additional_contexts,
             )
 
     @override
@@ -203,6 +224,15 @@ class DefaultCallContext(CallContext):
             type(props), key=key if key is not None else props.key, additional_contexts=additional_contexts
         )
         self._add_child(child_fibre_node)
+        # An up-to-date child re-evaluated with equal props would just return its previous state from Fibre.run, so
+        # return it directly and skip the call
+        if (
+            self.fibre.incremental
+            and (child_fibre_node_state := child_fibre_node.get_fibre_node_state()) is not None
+            and not child_fibre_node.is_out_of_date()
+            and (child_fibre_node_state.props is props or child_fibre_node_state.props == props)
+        ):
+            return child_fibre_node_state
         return self.fibre.run(child_fibre_node, props)
 
     @override
@@ -213,14 +243,19 @@ class DefaultCallContext(CallContext):
     def _get_current_predecessors(self) -> Sequence["FibreNode"]:
         if self._current_predecessors is None:
             return NO_PREDECESSORS
-        else:
+        elif self._previous_state is None:
+            # First evaluation: there's no previous sequence that could be reused
             return tuple(self._current_predecessors)
+        else:
+            return _freeze_fibre_nodes(self._current_predecessors, self._previous_state.predecessors)
 
     def _get_current_children(self) -> Sequence["FibreNode"]:
         if self._current_children is None:
             return NO_CHILDREN
-        else:
+        elif self._previous_state is None:
             return tuple(self._current_children)
+        else:
+            return _freeze_fibre_nodes(self._current_children, self._previous_state.children)
 
     @override
     def get_last_child(self) -> "FibreNode":
@@ -232,13 +267,26 @@ class DefaultCallContext(CallContext):
     def create_fibre_node_state(
         self, props: PropsT, result: ResultT, state: StateT
     ) -> FibreNodeState[PropsT, ResultT, StateT]:
+        previous_state = self._previous_state
+        predecessors = self._get_current_predecessors()
+        children = self._get_current_children()
         next_result_version: int
-        if self._previous_state is not None:
-            next_result_version = (
-                self._previous_state.result_version
-                if result == self._previous_state.result
-                else self._previous_state.result_version + 1
-            )
+        if previous_state is not None:
+            if result is previous_state.result or result == previous_state.result:
+                # Reuse the previous state if nothing in it has changed. The predecessors and children are reused by
+                # _get_current_predecessors and _get_current_children when they're unchanged, so identity suffices.
+                if (
+                    result is previous_state.result
+                    and props is previous_state.props
+                    and state is previous_state.state
+                    and predecessors is previous_state.predecessors
+                    and children is previous_state.children
+                    and previous_state.tree_structure_predecessors is NO_PREDECESSORS
+                ):
+                    return cast("FibreNodeState[PropsT, ResultT, StateT]", previous_state)
+                next_result_version = previous_state.result_version
+            else:
+                next_result_version = previous_state.result_version + 1
         else:
             next_result_version = 1
         return FibreNodeState(
@@ -246,24 +294,32 @@ class DefaultCallContext(CallContext):
             result=result,
             result_version=next_result_version,
             state=state,
-            predecessors=self._get_current_predecessors(),
-            children=self._get_current_children(),
+            predecessors=predecessors,
+            children=children,
         )
 
 
-@mutable(eq=False, weakref_slot=static_configuration.ENABLE_WEAK_REFERENCE_SUPPORT, repr=False)
+# eq=False keeps object's identity-based __eq__ and __hash__, which are implemented in C. FibreNodes are used as set
+# members and dict keys throughout the runtime.
+@mutable(eq=False, slots=True, weakref_slot=static_configuration.ENABLE_WEAK_REFERENCE_SUPPORT, repr=False)
 class FibreNode(Generic[PropsT, ResultT, StateT, UpdateT]):
     # I'd really like to be able to say that PropsT is bound by FibreNodeFunction[ResultT, StateT, UpdateT], but that's
     # not possible. That causes some unfortunate casts to be required throughout.
-    key: Key = field(on_setattr=setters.frozen)
-    parent: Optional["FibreNode"] = field(on_setattr=setters.frozen)
-    props_type: Type[FibreNodeFunction[ResultT, StateT, UpdateT]] = field(on_setattr=setters.frozen)
-    key_path: KeyPath = field(
-        init=False, default=Factory(_get_fibre_node_key_path, takes_self=True), on_setattr=setters.frozen
-    )
-    contexts: ChainMap[Any, "FibreNode"] = field(
-        default=Factory(_get_parent_contexts, takes_self=True), on_setattr=setters.frozen
-    )
+    #
+    # key, parent, props_type and depth must not be reassigned. This isn't enforced with on_setattr=setters.frozen
+    # because any on_setattr hook makes attrs generate a Python-level __setattr__ for the whole class, which would make
+    # every assignment to the mutable fields below (e.g. bumping the dependencies version) several times slower.
+    key: Key
+    parent: Optional["FibreNode"]
+    props_type: Type[FibreNodeFunction[ResultT, StateT, UpdateT]]
+    # The key path is only needed for diagnostics, rendering and captures, so it's built on first access rather than
+    # when the node is created
+    _key_path: Optional[KeyPath] = field(init=False, default=None)
+    depth: int = field(init=False, default=Factory(_get_fibre_node_depth, takes_self=True))
+    _context_overrides: Optional[Mapping[Any, "FibreNode"]] = None
+    # The contexts visible to this node: those of its parent, with this node's overrides (if any) applied on top. This
+    # is a flat mapping so that looking up a context is a single dict lookup.
+    contexts: Mapping[Any, "FibreNode"] = field(init=False, default=Factory(_get_fibre_node_contexts, takes_self=True))
 
     _fibre_node_state: Optional[FibreNodeState[FibreNodeFunction[ResultT, StateT, UpdateT], ResultT, StateT]] = None
     _previous_dependencies_version: int = 0
@@ -278,6 +334,25 @@ class FibreNode(Generic[PropsT, ResultT, StateT, UpdateT]):
     def __repr__(self) -> str:
         return f"FibreNode(key_path={self.key_path})"
 
+    @property
+    def key_path(self) -> KeyPath:
+        if self._key_path is None:
+            parent_key_path = self.parent.key_path if self.parent is not None else ()
+            self._key_path = (*parent_key_path, self.key)
+        return self._key_path
+
+    def set_context_overrides(self, context_overrides: Optional[Mapping[Any, "FibreNode"]]) -> None:
+        if context_overrides is self._context_overrides or context_overrides == self._context_overrides:
+            return
+        self._context_overrides = context_overrides
+        # Descendants have flattened copies of (or share) this node's contexts, so they need to be updated too
+        fibre_nodes_to_update: list[FibreNode] = [self]
+        while fibre_nodes_to_update:
+            fibre_node = fibre_nodes_to_update.pop()
+            fibre_node.contexts = _get_fibre_node_contexts(fibre_node)
+            if (fibre_node_state := fibre_node._fibre_node_state) is not None:
+                fibre_nodes_to_update.extend(fibre_node_state.children)
+
     def add_successor(self, successor_fibre_node: "FibreNode") -> None:
         if self._successors is None:
             self._successors = [successor_fibre_node]
@@ -315,15 +390,18 @@ class FibreNode(Generic[PropsT, ResultT, StateT, UpdateT]):
             self._enqueued_updates.append(update)
         self.increment_next_dependencies_version_and_schedule(schedule_on_fibre)
 
-    def _create_execution_token(self) -> FibreNodeExecutionToken[UpdateT]:
-        return FibreNodeExecutionToken(
-            dependencies_version=self._next_dependencies_version,
-            enqueued_updates=self._enqueued_updates,
-            enqueued_updates_stop=len(self._enqueued_updates) if self._enqueued_updates is not None else 0,
-        )
+    def enqueue_updates(self, updates: Iterable[UpdateT], schedule_on_fibre: "Fibre") -> None:
+        new_updates = list(updates)
+        if not new_updates:
+            return
+        if self._enqueued_updates is None:
+            self._enqueued_updates = new_updates
+        else:
+            self._enqueued_updates.extend(new_updates)
+        self.increment_next_dependencies_version_and_schedule(schedule_on_fibre)
 
     def get_fibre_node_state(self) -> Optional[FibreNodeState[PropsT, ResultT, StateT]]:
-        return cast(FibreNodeState[PropsT, ResultT, StateT], self._fibre_node_state)
+        return cast("FibreNodeState[PropsT, ResultT, StateT]", self._fibre_node_state)
 
     def is_out_of_date(self) -> int:
         return self._next_dependencies_version != self._previous_dependencies_version
@@ -333,41 +411,84 @@ class FibreNode(Generic[PropsT, ResultT, StateT, UpdateT]):
             schedule_on_fibre.schedule(self)
         self._next_dependencies_version += 1
 
-    def __hash__(self) -> int:
-        return id(self)
-
-    def __eq__(self, other: Any) -> bool:
-        return other is self
-
+    # The casts on the evaluation path name their types as strings. Subscripting a generic class at runtime builds an
+    # alias object on every call, which costs more than the rest of the fast path.
     def run(self, fibre: "Fibre", props: PropsT, incremental: bool = True) -> FibreNodeState[PropsT, ResultT, StateT]:
+        previous_fibre_node_state = self._fibre_node_state
+        # Fast path: restoring an up-to-date node that is being re-evaluated with the same props object
+        if (
+            incremental
+            and previous_fibre_node_state is not None
+            and previous_fibre_node_state.props is props
+            and self._next_dependencies_version == self._previous_dependencies_version
+        ):
+            return cast("FibreNodeState[PropsT, ResultT, StateT]", previous_fibre_node_state)
+        return self._compute(fibre, props, incremental, previous_fibre_node_state)
+
+    def _compute(
+        self,
+        fibre: "Fibre",
+        props: PropsT,
+        incremental: bool,
+        previous_fibre_node_state: Optional[
+            FibreNodeState[FibreNodeFunction[ResultT, StateT, UpdateT], ResultT, StateT]
+        ],
+    ) -> FibreNodeState[PropsT, ResultT, StateT]:
         if not isinstance(props, self.props_type):
             raise PropsTypeConflictError(props=props, expected_type=self.props_type)
-        previous_fibre_node_state = self._fibre_node_state
-        if previous_fibre_node_state is not None and previous_fibre_node_state.props != props:
+        if (
+            previous_fibre_node_state is not None
+            and previous_fibre_node_state.props is not props
+            and previous_fibre_node_state.props != props
+        ):
             self._next_dependencies_version += 1
 
-        execution_token = self._create_execution_token()
         if (
             incremental
             and previous_fibre_node_state is not None
-            and execution_token.dependencies_version == self._previous_dependencies_version
+            and self._next_dependencies_version == self._previous_dependencies_version
         ):
-            return cast(FibreNodeState[PropsT, ResultT, StateT], previous_fibre_node_state)
-
-        fibre.instrumentation.on_node_evaluation_start(self)
+            return cast("FibreNodeState[PropsT, ResultT, StateT]", previous_fibre_node_state)
+
+        # Snapshot the dependencies version and the number of enqueued updates being evaluated. Only those updates are
+        # passed to the props and removed once evaluation completes: updates enqueued during evaluation (e.g. by a
+        # reducer calling its own setter) are appended to the same list and left for the next evaluation.
+        dependencies_version = self._next_dependencies_version
+        enqueued_updates = self._enqueued_updates
+        enqueued_updates_stop = len(enqueued_updates) if enqueued_updates is not None else 0
+
+        instrumentation = fibre.instrumentation
+        is_instrumented = instrumentation is not NO_OP_FIBRE_INSTRUMENTATION
+        if is_instrumented:
+            instrumentation.on_node_evaluation_start(self)
         ctx = fibre.call_context_factory.create_call_context(
             fibre=fibre, fibre_node=self, previous_state=previous_fibre_node_state
         )
-        next_fibre_node_state = cast(FibreNodeFunction[ResultT, StateT, UpdateT], props).run(
+        next_fibre_node_state = cast("FibreNodeFunction[ResultT, StateT, UpdateT]", props).run(
             ctx,
             previous_state=previous_fibre_node_state,
-            enqueued_updates=execution_token.get_enqueued_updates(),
+            enqueued_updates=itertools.islice(enqueued_updates, enqueued_updates_stop)
+            if enqueued_updates is not None and enqueued_updates_stop
+            else _EMPTY_ITERATOR,
         )
-        fibre.instrumentation.on_node_evaluation_end(self)
+        if is_instrumented:
+            instrumentation.on_node_evaluation_end(self)
 
         self._fibre_node_state = next_fibre_node_state
-        self._previous_dependencies_version = execution_token.dependencies_version
+        self._previous_dependencies_version = dependencies_version
+
+        self._on_fibre_node_state_replaced(fibre, previous_fibre_node_state, next_fibre_node_state)
+        if enqueued_updates is not None and enqueued_updates_stop:
+            self._remove_evaluated_updates(enqueued_updates, enqueued_updates_stop)
 
+        return cast("FibreNodeState[PropsT, ResultT, StateT]", next_fibre_node_state)
+
+    def _on_fibre_node_state_replaced(
+        self,
+        fibre: "Fibre",
+        previous_fibre_node_state: Optional[FibreNodeState],
+        next_fibre_node_state: FibreNodeState,
+    ) -> None:
         previous_predecessors: Sequence[FibreNode]
         previous_children: Sequence[FibreNode]
         previous_tree_structure_predecessors: Sequence[FibreNode]
@@ -384,25 +505,32 @@ class FibreNode(Generic[PropsT, ResultT, StateT, UpdateT]):
         next_tree_structure_predecessors = next_fibre_node_state.tree_structure_predecessors
 
         # change in predecessors
-        if previous_predecessors != next_predecessors:
+        if previous_predecessors is not next_predecessors and previous_predecessors != next_predecessors:
             self._on_predecessors_changed(
                 previous_predecessors=previous_predecessors, next_predecessors=next_predecessors
             )
 
         # change in children
-        if previous_children != next_children:
+        if previous_children is not next_children and previous_children != next_children:
             self._on_children_changed(fibre, previous_children=previous_children, next_children=next_children)
 
         # change in tree structure predecessors
-        if previous_tree_structure_predecessors != next_tree_structure_predecessors:
+        if (
+            previous_tree_structure_predecessors is not next_tree_structure_predecessors
+            and previous_tree_structure_predecessors != next_tree_structure_predecessors
+        ):
             self._on_tree_structure_predecessors_changed(
                 previous_tree_structure_predecessors=previous_tree_structure_predecessors,
                 next_tree_structure_predecessors=next_tree_structure_predecessors,
             )
-        if self._enqueued_updates is not None:
-            del self._enqueued_updates[: execution_token.enqueued_updates_stop]
 
-        return cast(FibreNodeState[PropsT, ResultT, StateT], next_fibre_node_state)
+    @staticmethod
+    def _remove_evaluated_updates(enqueued_updates: list[UpdateT], enqueued_updates_stop: int) -> None:
+        # The list is kept for the next update rather than being reset to None
+        if enqueued_updates_stop == len(enqueued_updates):
+            enqueued_updates.clear()
+        else:
+            del enqueued_updates[:enqueued_updates_stop]
 
     def _on_predecessors_changed(
         self,
@@ -410,32 +538,41 @@ class FibreNode(Generic[PropsT, ResultT, StateT, UpdateT]):
         previous_predecessors: Sequence["FibreNode"],
         next_predecessors: Sequence["FibreNode"],
     ) -> None:
-        if previous_predecessors:
-            next_predecessors_set = set(next_predecessors)
-            for previous_predecessor in previous_predecessors:
-                if previous_predecessor not in next_predecessors_set:
-                    previous_predecessor.remove_successor(self)
-        if next_predecessors:
-            previous_predecessors_set = set(previous_predecessors)
-            for next_predecessor in next_predecessors:
-                if next_predecessor not in previous_predecessors_set:
-                    next_predecessor.add_successor(self)
+        self._update_predecessor_links(
+            previous_predecessors,
+            next_predecessors,
+            add_link=FibreNode.add_successor,
+            remove_link=FibreNode.remove_successor,
+        )
 
     def _on_tree_structure_predecessors_changed(
         self,
         previous_tree_structure_predecessors: Sequence["FibreNode"],
         next_tree_structure_predecessors: Sequence["FibreNode"],
     ) -> None:
-        if previous_tree_structure_predecessors:
-            next_tree_structure_predecessors_set = set(next_tree_structure_predecessors)
-            for previous_tree_structure_predecessor in previous_tree_structure_predecessors:
-                if previous_tree_structure_predecessor not in next_tree_structure_predecessors_set:
-                    previous_tree_structure_predecessor.remove_tree_structure_successor(self)
-        if next_tree_structure_predecessors:
-            previous_tree_structure_predecessors_set = set(previous_tree_structure_predecessors)
-            for next_tree_structure_predecessor in next_tree_structure_predecessors:
-                if next_tree_structure_predecessor not in previous_tree_structure_predecessors_set:
-                    next_tree_structure_predecessor.add_tree_structure_successor(self)
+        self._update_predecessor_links(
+            previous_tree_structure_predecessors,
+            next_tree_structure_predecessors,
+            add_link=FibreNode.add_tree_structure_successor,
+            remove_link=FibreNode.remove_tree_structure_successor,
+        )
+
+    def _update_predecessor_links(
+        self,
+        previous_predecessors: Sequence["FibreNode"],
+        next_predecessors: Sequence["FibreNode"],
+        *,
+        add_link: Callable[["FibreNode", "FibreNode"], None],
+        remove_link: Callable[["FibreNode", "FibreNode"], None],
+    ) -> None:
+        previous_predecessors_lookup = _create_lookup(previous_predecessors)
+        next_predecessors_lookup = _create_lookup(next_predecessors)
+        for previous_predecessor in previous_predecessors:
+            if previous_predecessor not in next_predecessors_lookup:
+                remove_link(previous_predecessor, self)
+        for next_predecessor in next_predecessors:
+            if next_predecessor not in previous_predecessors_lookup:
+                add_link(next_predecessor, self)
 
     @staticmethod
     def _on_children_changed(
@@ -445,26 +582,29 @@ class FibreNode(Generic[PropsT, ResultT, StateT, UpdateT]):
         next_children: Sequence["FibreNode"],
     ) -> None:
         if previous_children:
-            next_children_set = set(next_children)
+            next_children_lookup = _create_lookup(next_children)
             for previous_child in previous_children:
-                if previous_child in next_children_set:
+                if previous_child in next_children_lookup:
                     previous_child.on_tree_position_changed(fibre)
                 else:
                     previous_child.dispose()
 
     def dispose(self) -> None:
-        if (fibre_node_state := self._fibre_node_state) is not None:
-            cast(FibreNodeFunction[ResultT, StateT, UpdateT], self.props_type).dispose(
-                cast(FibreNodeState[FibreNodeFunction[ResultT, StateT, UpdateT], ResultT, StateT], fibre_node_state)
-            )
+        # This walks the subtree with an explicit stack rather than recursing so that disposing a deep tree can't hit
+        # the recursion limit. Nodes are disposed in the same order as a recursive pre-order traversal would.
+        fibre_nodes_to_dispose: list[FibreNode] = [self]
+        while fibre_nodes_to_dispose:
+            fibre_node = fibre_nodes_to_dispose.pop()
+            if (fibre_node_state := fibre_node._fibre_node_state) is None:
+                continue
+            cast("FibreNodeFunction[Any, Any, Any]", fibre_node.props_type).dispose(fibre_node_state)
             for predecessor in fibre_node_state.predecessors:
-                predecessor.remove_successor(self)
+                predecessor.remove_successor(fibre_node)
             for tree_structure_predecessor in fibre_node_state.tree_structure_predecessors:
-                tree_structure_predecessor.remove_tree_structure_successor(self)
-            for child in fibre_node_state.children:
-                child.dispose()
-            self._fibre_node_state = None
-            self._enqueued_updates = None
+                tree_structure_predecessor.remove_tree_structure_successor(fibre_node)
+            fibre_nodes_to_dispose.extend(reversed(fibre_node_state.children))
+            fibre_node._fibre_node_state = None
+            fibre_node._enqueued_updates = None
 
     def get_fibre_node(self, relative_key_path: Iterable[Key]) -> "FibreNode":
         key_path_iterator = iter(relative_key_path)
@@ -507,10 +647,17 @@ class DefaultCallContextFactory(CallContextFactory):
 
 @mutable(eq=False, weakref_slot=False)
 class Fibre:
-    _work_queue: deque[FibreNode] = Factory(deque)
+    # Scheduled nodes are run shallowest first so that re-running an ancestor brings any of its scheduled descendants
+    # up to date before they are popped. The sequence number keeps nodes at the same depth in FIFO order and ensures
+    # that FibreNodes themselves are never compared.
+    _work_queue: list[tuple[int, int, FibreNode]] = Factory(list)
+    _work_queue_sequence: Iterator[int] = Factory(itertools.count)
+    # The nodes currently in the work queue. A node that is brought up to date before it is popped (e.g. because an
+    # ancestor was run directly) and then becomes out of date again would otherwise be queued a second time.
+    _scheduled: set[FibreNode] = Factory(set)
     _evaluation_stack: list[FibreNode] = Factory(list)
     call_context_factory: CallContextFactory = DefaultCallContextFactory()
-    instrumentation: FibreInstrumentation = NoOpFibreInstrumentation()
+    instrumentation: FibreInstrumentation = NO_OP_FIBRE_INSTRUMENTATION
     incremental: bool = field(default=True, on_setattr=setters.frozen)
 
     def run(
@@ -542,11 +689,20 @@ class Fibre:
 
     def schedule(self, fibre_node: FibreNode) -> None:
         assert fibre_node.get_fibre_node_state() is not None
-        self._work_queue.append(fibre_node)
+        if fibre_node in self._scheduled:
+            return
+        self._scheduled.add(fibre_node)
+        heapq.heappush(self._work_queue, (fibre_node.depth, next(self._work_queue_sequence), fibre_node))
 
     def drain_work_queue(self) -> None:
-        while self._work_queue:
-            fibre_node = self._work_queue.popleft()
+        work_queue = self._work_queue
+        scheduled = self._scheduled
+        while work_queue:
+            _, _, fibre_node = heapq.heappop(work_queue)
+            scheduled.discard(fibre_node)
             if (fibre_node_state := fibre_node.get_fibre_node_state()) is None:
                 continue
+            if not fibre_node.is_out_of_date():
+                # Already brought up to date by the re-evaluation of an ancestor
+                continue
             self.run(fibre_node, fibre_node_state.props)
@@ -1,10 +1,10 @@
 import asyncio
-from typing import Awaitable, Callable, Generic, Iterator, Optional, ParamSpec, Tuple, TypeVar, cast
+from typing import Any, Awaitable, Callable, Generic, Iterator, Optional, ParamSpec, Tuple, TypeVar, cast
 
 from attr import field, frozen
 from typing_extensions import Self, override
 
-from pybt2.runtime.fibre import CallContext
+from pybt2.runtime.fibre import CallContext, Fibre, FibreNode
 from pybt2.runtime.function_call import RuntimeCallableProps
 from pybt2.runtime.types import (
     Dependencies,
@@ -20,6 +20,12 @@ from pybt2.runtime.types import (
 T = TypeVar("T")
 
 
+def _are_dependencies_equal(previous_dependencies: Dependencies, next_dependencies: Dependencies) -> bool:
+    # Callers often pass the same dependencies object on every evaluation, which makes the element-wise comparison
+    # unnecessary
+    return previous_dependencies is next_dependencies or previous_dependencies == next_dependencies
+
+
 @frozen(weakref_slot=False)
 class UseVersionHook(FibreNodeFunction[int, None, None]):
     dependencies: Dependencies
@@ -33,7 +39,7 @@ class UseVersionHook(FibreNodeFunction[int, None, None]):
     ) -> FibreNodeState[Self, int, None]:
         result: int
         if previous_state is not None:
-            if previous_state.props.dependencies == self.dependencies:
+            if _are_dependencies_equal(previous_state.props.dependencies, self.dependencies):
                 return previous_state
             result = previous_state.result + 1
         else:
@@ -48,6 +54,16 @@ def use_version(ctx: CallContext, dependencies: Dependencies, key: Optional[Key]
 UseStateResult = Tuple[T, Setter[T]]
 
 
+@frozen(eq=False, weakref_slot=False)
+class _UseStateSetter:
+    # A slotted callable rather than a closure. It holds the fibre node and fibre, but not the call context.
+    fibre_node: FibreNode
+    fibre: Fibre
+
+    def __call__(self, reducer: Reducer[Any]) -> None:
+        self.fibre_node.enqueue_update(reducer, self.fibre)
+
+
 @frozen(weakref_slot=False)
 class UseStateHook(FibreNodeFunction[UseStateResult[T], None, Reducer[T]], Generic[T]):
     value: T = field(eq=False)
@@ -67,18 +83,13 @@ class UseStateHook(FibreNodeFunction[UseStateResult[T], None, Reducer[T]], Gener
             value = previous_value
             setter = previous_setter
             for update in enqueued_updates:
-                value = cast(Callable[[T], T], update)(value) if callable(update) else cast(T, update)
-            if value == previous_value:
+                value = update(value) if callable(update) else update
+            # Sentinel results such as ASYNC_RUNNING are usually the same object, which skips their attrs __eq__
+            if value is previous_value or value == previous_value:
                 return previous_state
         else:
             value = self.value
-
-            # ensure we don't capture "ctx" in the 'setter' closure
-            fibre_node = ctx.fibre_node
-            fibre = ctx.fibre
-
-            def setter(reducer: Reducer[T]) -> None:
-                fibre_node.enqueue_update(reducer, fibre)
+            setter = _UseStateSetter(ctx.fibre_node, ctx.fibre)
 
         return ctx.create_fibre_node_state(props=self, result=(value, setter), state=None)
 
@@ -104,7 +115,7 @@ class UseResourceHook(FibreNodeFunction[T, UseResourceHookState, None], Generic[
         enqueued_updates: Iterator[None],
     ) -> FibreNodeState[Self, T, UseResourceHookState]:
         if previous_state is not None:
-            if previous_state.props.dependencies == self.dependencies:
+            if _are_dependencies_equal(previous_state.props.dependencies, self.dependencies):
                 return previous_state
             else:
                 self.dispose(previous_state)
@@ -150,17 +161,53 @@ def use_resource(
     )
 
 
+# use_memo and use_callback have their own hooks rather than wrapping their arguments in a resource factory. Nothing
+# needs disposing, and the wrapper would be a new closure on every evaluation.
+@frozen(weakref_slot=False)
+class UseMemoHook(FibreNodeFunction[T, None, None], Generic[T]):
+    factory: Callable[[], T] = field(eq=False)
+    dependencies: Dependencies
+
+    @override
+    def run(
+        self,
+        ctx: CallContext,
+        previous_state: Optional[FibreNodeState[Self, T, None]],
+        enqueued_updates: Iterator[None],
+    ) -> FibreNodeState[Self, T, None]:
+        if previous_state is not None and _are_dependencies_equal(previous_state.props.dependencies, self.dependencies):
+            return previous_state
+        return ctx.create_fibre_node_state(props=self, result=self.factory(), state=None)
+
+
 def use_memo(ctx: CallContext, factory: Callable[[], T], dependencies: Dependencies, key: Optional[Key] = None) -> T:
-    return use_resource(ctx, lambda _: factory(), dependencies, key)
+    return ctx.evaluate_child(UseMemoHook(factory, dependencies), key=key)
 
 
 P = ParamSpec("P")
 
 
+@frozen(weakref_slot=False)
+class UseCallbackHook(FibreNodeFunction[Callable[P, T], None, None], Generic[P, T]):
+    callback: Callable[P, T] = field(eq=False)
+    dependencies: Dependencies
+
+    @override
+    def run(
+        self,
+        ctx: CallContext,
+        previous_state: Optional[FibreNodeState[Self, Callable[P, T], None]],
+        enqueued_updates: Iterator[None],
+    ) -> FibreNodeState[Self, Callable[P, T], None]:
+        if previous_state is not None and _are_dependencies_equal(previous_state.props.dependencies, self.dependencies):
+            return previous_state
+        return ctx.create_fibre_node_state(props=self, result=self.callback, state=None)
+
+
 def use_callback(
     ctx: CallContext, callback: Callable[P, T], dependencies: Dependencies, key: Optional[Key] = None
 ) -> Callable[P, T]:
-    return use_resource(ctx, lambda _: callback, dependencies, key)
+    return ctx.evaluate_child(UseCallbackHook(callback, dependencies), key=key)
 
 
 def use_effect(
@@ -191,8 +238,9 @@ class AsyncCancelled:
 
 AsyncResult = AsyncSuccess[T] | AsyncFailure | AsyncRunning | AsyncCancelled
 
-_ASYNC_RUNNING = AsyncRunning()
-_ASYNC_CANCELLED = AsyncCancelled()
+# Shared instances of the stateless async results. Reusing them lets use_state detect an unchanged result by identity.
+ASYNC_RUNNING = AsyncRunning()
+ASYNC_CANCELLED = AsyncCancelled()
 
 
 @frozen(weakref_slot=False)
@@ -203,12 +251,12 @@ class UseAsync(RuntimeCallableProps[AsyncResult[T]], Generic[T]):
 
     def __call__(self, ctx: CallContext) -> AsyncResult[T]:
         dependencies_version = use_version(ctx, self.dependencies, key="version")
-        async_result, set_async_result = use_state(ctx, cast(AsyncResult[T], _ASYNC_RUNNING), key=dependencies_version)
+        async_result, set_async_result = use_state(ctx, cast("AsyncResult[T]", ASYNC_RUNNING), key=dependencies_version)
 
         def construct_awaitable(on_dispose: OnDispose) -> asyncio.Task[T]:
             def on_done(completed_task: asyncio.Task[T]) -> None:
                 if completed_task.cancelled():
-                    set_async_result(_ASYNC_CANCELLED)
+                    set_async_result(ASYNC_CANCELLED)
                 elif (exception := completed_task.exception()) is not None:
                     set_async_result(AsyncFailure(exception))
                 else:
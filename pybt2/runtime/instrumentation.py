@@ -24,3 +24,7 @@ class NoOpFibreInstrumentation(FibreInstrumentation):
 
     def on_node_evaluation_end(self, fibre_node: "FibreNode") -> None:  # pragma: no cover
         pass
+
+
+# The instrumentation used by default. Fibre skips the calls to it altogether.
+NO_OP_FIBRE_INSTRUMENTATION = NoOpFibreInstrumentation()
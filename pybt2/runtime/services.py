@@ -16,8 +16,8 @@ from pybt2.runtime.contexts import ContextProvider
 from pybt2.runtime.fibre import CallContext
 from pybt2.runtime.function_call import RuntimeCallableProps
 from pybt2.runtime.hooks import (
+    ASYNC_RUNNING,
     AsyncResult,
-    AsyncRunning,
     use_state,
     use_version,
 )
@@ -29,9 +29,6 @@ RequestT = TypeVar("RequestT")
 ResponseT = TypeVar("ResponseT")
 
 
-_ASYNC_RUNNING = AsyncRunning()
-
-
 @frozen(weakref_slot=False)
 class ApiCall(Generic[RequestT, ResponseT]):
     request: RequestT
@@ -47,7 +44,7 @@ class UseApiCall(RuntimeCallableProps[AsyncResult[ResponseT]], Generic[ApiT, Req
     def __call__(self, ctx: CallContext) -> AsyncResult[ResponseT]:
         dependencies_version = use_version(ctx, dependencies=self.dependencies, key="version")
         async_result, set_async_result = use_state(
-            ctx, cast(AsyncResult[ResponseT], _ASYNC_RUNNING), key=dependencies_version
+            ctx, cast("AsyncResult[ResponseT]", ASYNC_RUNNING), key=dependencies_version
         )
 
         use_capture(ctx, CaptureKey(self.api), ApiCall(self.request, set_async_result), key="capture")
@@ -63,7 +60,7 @@ def use_api_call(
     key: Optional[Key] = None,
 ) -> AsyncResult[ResponseT]:
     return ctx.evaluate_child(
-        UseApiCall(api=api, request=request, dependencies=dependencies if dependencies is not None else [request]),
+        UseApiCall(api=api, request=request, dependencies=dependencies if dependencies is not None else (request,)),
         key=key,
     )
 
@@ -86,9 +83,7 @@ class ApiCallContextProvider(RuntimeCallableProps[T], Generic[T, RequestT, Respo
         )
 
     def __call__(self, ctx: CallContext) -> T:
-        child_result, ordered_api_calls = ctx.evaluate_child(
-            OrderedCaptureProvider[T, ApiCall[RequestT, ResponseT]](self.capture_key, self.child)
-        )
+        child_result, ordered_api_calls = ctx.evaluate_child(OrderedCaptureProvider(self.capture_key, self.child))
 
         ctx.evaluate_child(ContextProvider(self.context_key, ordered_api_calls, self.api_call_evaluator))
 
@@ -1,4 +1,4 @@
-from typing import Iterator, Optional
+from typing import Iterator, Optional, Sequence
 
 from attr import field, frozen
 from typing_extensions import Self
@@ -7,6 +7,8 @@ from pybt2.runtime.fibre import CallContext, FibreNode
 from pybt2.runtime.types import NO_PREDECESSORS, FibreNodeFunction, FibreNodeState
 
 TreePosition = tuple[int, ...]
+# The index in the parent and the parent tree position's result version that a tree position was calculated from
+ReturnTreePositionState = tuple[int, int]
 
 
 @frozen
@@ -20,18 +22,18 @@ class InvalidFibreNodeDependency(Exception):
 
 
 @frozen
-class ReturnTreePosition(FibreNodeFunction[TreePosition, None, None]):
+class ReturnTreePosition(FibreNodeFunction[TreePosition, ReturnTreePositionState, None]):
     position_for_fibre_node: FibreNode = field(repr=lambda node: str(node.key_path))
-    parent_tree_position_fibre_node: Optional[FibreNode["ReturnTreePosition", TreePosition, None, None]] = field(
-        repr=lambda optional_node: str(optional_node.key_path) if optional_node is not None else str(None)
-    )
+    parent_tree_position_fibre_node: Optional[
+        FibreNode["ReturnTreePosition", TreePosition, ReturnTreePositionState, None]
+    ] = field(repr=lambda optional_node: str(optional_node.key_path) if optional_node is not None else str(None))
 
     def run(
         self,
         ctx: CallContext,
-        previous_state: Optional[FibreNodeState[Self, TreePosition, None]],
+        previous_state: Optional[FibreNodeState[Self, TreePosition, ReturnTreePositionState]],
         enqueued_updates: Iterator[None],
-    ) -> FibreNodeState[Self, TreePosition, None]:
+    ) -> FibreNodeState[Self, TreePosition, ReturnTreePositionState]:
         parent = self.position_for_fibre_node.parent
         if parent is None:
             raise CannotFindTreePositionOfRootNode(self.position_for_fibre_node)
@@ -40,27 +42,67 @@ class ReturnTreePosition(FibreNodeFunction[TreePosition, None, None]):
         if parent_fibre_node_state is None:
             raise InvalidFibreNodeDependency(ctx.fibre_node)
 
-        index_in_parent = parent_fibre_node_state.children.index(self.position_for_fibre_node)
+        parent_children = parent_fibre_node_state.children
+        parent_tree_position_fibre_node_state = (
+            self.parent_tree_position_fibre_node.get_fibre_node_state()
+            if self.parent_tree_position_fibre_node is not None
+            else None
+        )
+        parent_tree_position_result_version = (
+            parent_tree_position_fibre_node_state.result_version
+            if parent_tree_position_fibre_node_state is not None
+            else 0
+        )
+
+        predecessors: Sequence[FibreNode]
+        tree_structure_predecessors: Sequence[FibreNode]
+        if previous_state is not None and previous_state.props.position_for_fibre_node is self.position_for_fibre_node:
+            # The tree position can't have changed if the node is still at the same index in its parent and the
+            # parent's tree position is the same version. Only the index is kept in the state, rather than the parent's
+            # children, so that it doesn't keep removed siblings alive.
+            if previous_state.props.parent_tree_position_fibre_node is self.parent_tree_position_fibre_node:
+                previous_index_in_parent, previous_parent_tree_position_result_version = previous_state.state
+                if (
+                    previous_parent_tree_position_result_version == parent_tree_position_result_version
+                    and previous_index_in_parent < len(parent_children)
+                    and parent_children[previous_index_in_parent] is self.position_for_fibre_node
+                ):
+                    return previous_state
+                predecessors = previous_state.predecessors
+            else:
+                predecessors = self._create_predecessors()
+            tree_structure_predecessors = previous_state.tree_structure_predecessors
+        else:
+            predecessors = self._create_predecessors()
+            tree_structure_predecessors = (self.position_for_fibre_node,)
+
+        index_in_parent = parent_fibre_node_state.index_of_child(self.position_for_fibre_node)
         tree_position: TreePosition
-        if (
-            self.parent_tree_position_fibre_node is not None
-            and (parent_tree_position_fibre_node_state := self.parent_tree_position_fibre_node.get_fibre_node_state())
-            is not None
-        ):
+        if parent_tree_position_fibre_node_state is not None:
             tree_position = *parent_tree_position_fibre_node_state.result, index_in_parent
         else:
             tree_position = (index_in_parent,)
 
-        if previous_state is not None and tree_position == previous_state.result:
-            return previous_state
+        state = (index_in_parent, parent_tree_position_result_version)
+        result_version: int
+        if previous_state is None:
+            result_version = 1
+        elif tree_position == previous_state.result:
+            tree_position = previous_state.result
+            result_version = previous_state.result_version
+        else:
+            result_version = previous_state.result_version + 1
 
         return FibreNodeState(
             props=self,
             result=tree_position,
-            result_version=previous_state.result_version + 1 if previous_state is not None else 1,
-            state=None,
-            predecessors=(self.parent_tree_position_fibre_node,)
-            if self.parent_tree_position_fibre_node is not None
-            else NO_PREDECESSORS,
-            tree_structure_predecessors=(self.position_for_fibre_node,),
+            result_version=result_version,
+            state=state,
+            predecessors=predecessors,
+            tree_structure_predecessors=tree_structure_predecessors,
         )
+
+    def _create_predecessors(self) -> Sequence[FibreNode]:
+        if self.parent_tree_position_fibre_node is not None:
+            return (self.parent_tree_position_fibre_node,)
+        return NO_PREDECESSORS
@@ -9,9 +9,11 @@ from typing import (
     Sequence,
     TypeVar,
     Union,
+    cast,
 )
 
 from attr import field, frozen
+from attr.exceptions import FrozenInstanceError
 from typing_extensions import Self
 
 if TYPE_CHECKING:
@@ -57,15 +59,99 @@ class FibreNodeFunction(Generic[ResultT, StateT, UpdateT], metaclass=ABCMeta):
 PropsT = TypeVar("PropsT", bound=FibreNodeFunction)
 
 
-@frozen(weakref_slot=False)
+_object_setattr = object.__setattr__
+
+# Children sequences up to this length are scanned by index_of_child rather than indexed with a dict
+_SMALL_CHILDREN_SIZE = 8
+
+
 class FibreNodeState(Generic[PropsT, ResultT, StateT]):
+    # This is constructed on every evaluation of every fibre node, so it is written by hand rather than with attrs to
+    # keep construction cheap. Like an attrs frozen class, fields can't be set once constructed.
+    __slots__ = (
+        # Built by index_of_child on first use and left unset otherwise, so it costs nothing on construction
+        "_child_indices",
+        "children",
+        "predecessors",
+        "props",
+        "result",
+        "result_version",
+        "state",
+        "tree_structure_predecessors",
+    )
+
     props: PropsT
     result: ResultT
     result_version: int
     state: StateT
-    predecessors: Sequence["FibreNode"] = NO_PREDECESSORS
-    children: Sequence["FibreNode"] = NO_CHILDREN
-    tree_structure_predecessors: Sequence["FibreNode"] = NO_PREDECESSORS
+    predecessors: Sequence["FibreNode"]
+    children: Sequence["FibreNode"]
+    tree_structure_predecessors: Sequence["FibreNode"]
+    _child_indices: dict["FibreNode", int]
+
+    def __init__(  # noqa: PLR0913
+        self,
+        props: PropsT,
+        result: ResultT,
+        result_version: int,
+        state: StateT,
+        *,
+        predecessors: Sequence["FibreNode"] = NO_PREDECESSORS,
+        children: Sequence["FibreNode"] = NO_CHILDREN,
+        tree_structure_predecessors: Sequence["FibreNode"] = NO_PREDECESSORS,
+    ) -> None:
+        _object_setattr(self, "props", props)
+        _object_setattr(self, "result", result)
+        _object_setattr(self, "result_version", result_version)
+        _object_setattr(self, "state", state)
+        _object_setattr(self, "predecessors", predecessors)
+        _object_setattr(self, "children", children)
+        _object_setattr(self, "tree_structure_predecessors", tree_structure_predecessors)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError()
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError()
+
+    def index_of_child(self, child: "FibreNode") -> int:
+        children = self.children
+        if len(children) <= _SMALL_CHILDREN_SIZE:
+            return children.index(child)
+        try:
+            child_indices: dict[FibreNode, int] = self._child_indices
+        except AttributeError:
+            child_indices = {child: index for index, child in enumerate(children)}
+            _object_setattr(self, "_child_indices", child_indices)
+        if (index := child_indices.get(child)) is None:
+            raise ValueError(f"{child!r} is not a child")
+        return index
+
+    def _as_tuple(self) -> tuple[Any, ...]:
+        return (
+            self.props,
+            self.result,
+            self.result_version,
+            self.state,
+            self.predecessors,
+            self.children,
+            self.tree_structure_predecessors,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._as_tuple() == cast("FibreNodeState", other)._as_tuple()
+
+    def __hash__(self) -> int:
+        return hash(self._as_tuple())
+
+    def __repr__(self) -> str:
+        return (
+            f"FibreNodeState(props={self.props!r}, result={self.result!r}, result_version={self.result_version!r}, "
+            f"state={self.state!r}, predecessors={self.predecessors!r}, children={self.children!r}, "
+            f"tree_structure_predecessors={self.tree_structure_predecessors!r})"
+        )
 
 
 @frozen(eq=False, weakref_slot=False)
@@ -73,19 +159,45 @@ class UniqueString:
     value: str
 
 
-@frozen(weakref_slot=False)
-class ContextKey(Generic[T]):
+class _Key(Generic[T]):
+    # Context and capture keys are hashed and compared on every context and capture lookup, so they are written by hand
+    # rather than with attrs: the hash is computed once on construction, and __eq__ checks the ids for identity before
+    # comparing them. Like an attrs frozen class, fields can't be set once constructed, so the hash can't go stale.
+    __slots__ = ("_hash", "id")
+
     id: Any
+    _hash: int
 
-    @classmethod
-    def create_unique(cls, name: str) -> "ContextKey[T]":
-        return cls(UniqueString(name))
+    def __init__(self, id: Any) -> None:
+        _object_setattr(self, "id", id)
+        _object_setattr(self, "_hash", hash((self.__class__, id)))
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError()
 
-@frozen(weakref_slot=False)
-class CaptureKey(Generic[T]):
-    id: Any
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError()
 
     @classmethod
-    def create_unique(cls, name: str) -> "CaptureKey[T]":
+    def create_unique(cls, name: str) -> Self:
         return cls(UniqueString(name))
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        other_id = cast("_Key", other).id
+        return other_id is self.id or other_id == self.id
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(id={self.id!r})"
+
+
+class ContextKey(_Key[T]):
+    __slots__ = ()
+
+
+class CaptureKey(_Key[T]):
+    __slots__ = ()
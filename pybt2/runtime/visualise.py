@@ -1,7 +1,8 @@
+import functools
 import html
 import textwrap
 import types
-from typing import Any, Callable, Collection, Mapping, Optional, Sequence, Set, cast
+from typing import Any, Callable, Collection, Iterable, Iterator, Mapping, Optional, Sequence, Set, Type, cast
 
 import pydot
 from attr import Attribute, Factory, fields, frozen, mutable
@@ -15,58 +16,108 @@ def get_node_name(key_path: KeyPath) -> str:
 
 
 @frozen
-class NodeLabel:
-    _label: str
-
-    @classmethod
-    def create(cls, props: FibreNodeFunction) -> "NodeLabel":
-        return NodeLabel(
-            textwrap.dedent(
-                f"""\
-                <table border="0" cellborder="1" cellspacing="0">
-                <tr><td bgcolor="gray90"><b>{type(props).__qualname__}</b></td></tr>
-                {cls._format_fields(props)}
-                </table>
-                """
-            ).strip()
+class _FieldDescriptor:
+    name: str
+    repr: Optional[Callable[[Any], str]]
+    is_renderable: bool
+
+
+@functools.cache
+def _get_field_descriptors(props_type: Type[FibreNodeFunction]) -> tuple[_FieldDescriptor, ...]:
+    return tuple(
+        _FieldDescriptor(
+            name=field.name,
+            repr=field.repr if callable(field.repr) else None,
+            is_renderable=field.repr is not False and field.name != "key",
         )
+        for field in cast(tuple[Attribute, ...], fields(props_type))
+    )
 
-    def __str__(self) -> str:
-        return f"<{self._label}>"
 
-    @classmethod
-    def _should_render_field(cls, field: Attribute, field_value: Any) -> bool:
-        if field.repr is False or field.name == "key":
-            return False
-        if not cls._should_render_value(field_value):
-            return False
-        return True
+# Graphviz HTML-like labels are wrapped in angle brackets rather than quotes
+_UNEVALUATED_NODE_LABEL = "<<unevaluated>>"
 
-    @classmethod
-    def _should_render_value(cls, value: Any) -> bool:
-        if isinstance(value, (FibreNodeFunction, types.FunctionType)):
-            return False
-        if isinstance(value, Mapping) and any(not cls._should_render_value(map_value) for map_value in value.values()):
-            return False
-        if isinstance(value, Collection) and any(
-            not cls._should_render_value(collection_value) for collection_value in value
-        ):
-            return False
+
+def create_node_label(props: FibreNodeFunction) -> str:
+    return (
+        '<<table border="0" cellborder="1" cellspacing="0">\n'
+        f'<tr><td bgcolor="gray90"><b>{type(props).__qualname__}</b></td></tr>\n'
+        f"{_format_fields(props)}\n"
+        "</table>>"
+    )
+
+
+def _should_render_field(field: _FieldDescriptor, field_value: Any) -> bool:
+    if not field.is_renderable:
+        return False
+    if not _should_render_value(field_value):
+        return False
+    return True
+
+
+# Values of these types are rendered without scanning them for nested props. Strings in particular must not be scanned:
+# each character of a string is itself a string, so scanning would never terminate.
+_SCALAR_TYPES = (str, bytes, int, float, bool, type(None))
+
+
+def _should_render_value(value: Any) -> bool:
+    if isinstance(value, _SCALAR_TYPES):
         return True
+    if isinstance(value, (FibreNodeFunction, types.FunctionType)):
+        return False
+    if isinstance(value, Mapping) and any(not _should_render_value(map_value) for map_value in value.values()):
+        return False
+    if isinstance(value, Collection) and any(not _should_render_value(collection_value) for collection_value in value):
+        return False
+    return True
 
-    @classmethod
-    def _format_fields(cls, props: FibreNodeFunction) -> str:
-        lines: list[str] = []
-        for field in cast(tuple[Attribute, ...], fields(type(props))):
-            field_value = getattr(props, field.name)
-            if not cls._should_render_field(field, field_value):
-                continue
-            formatted_field_value = textwrap.shorten(
-                field.repr(field_value) if callable(field.repr) else repr(field_value), width=40
-            )
-            lines.append(f'<tr><td align="left"><i>{field.name}</i>={html.escape(formatted_field_value)}</td></tr>')
 
-        return "\n".join(lines)
+_FIELD_VALUE_WIDTH = 40
+# Equivalent to textwrap.shorten(..., width=_FIELD_VALUE_WIDTH), which creates a new TextWrapper on every call
+_FIELD_VALUE_WRAPPER = textwrap.TextWrapper(width=_FIELD_VALUE_WIDTH, max_lines=1, placeholder=" [...]")
+
+
+def _shorten_field_value(field_value: str) -> str:
+    collapsed_field_value = " ".join(field_value.split())
+    if len(collapsed_field_value) <= _FIELD_VALUE_WIDTH:
+        return collapsed_field_value
+    return _FIELD_VALUE_WRAPPER.fill(collapsed_field_value)
+
+
+def _format_fields(props: FibreNodeFunction) -> str:
+    lines: list[str] = []
+    for field in _get_field_descriptors(type(props)):
+        field_value = getattr(props, field.name)
+        if not _should_render_field(field, field_value):
+            continue
+        formatted_field_value = _shorten_field_value(
+            field.repr(field_value) if field.repr is not None else repr(field_value)
+        )
+        lines.append(f'<tr><td align="left"><i>{field.name}</i>={html.escape(formatted_field_value)}</td></tr>')
+
+    return "\n".join(lines)
+
+
+def _extend_with_props_items(
+    children: list[tuple[str, FibreNodeFunction]], field_name: str, items: Iterable[tuple[Any, Any]]
+) -> None:
+    # Items are only rendered as children if every value is a props, so anything appended is removed again as soon as a
+    # value that isn't a props is found. This checks and collects the items in a single pass.
+    children_start = len(children)
+    for key, value in items:
+        if not isinstance(value, FibreNodeFunction):
+            del children[children_start:]
+            return
+        children.append((f"{field_name}.{key}", value))
+
+
+@frozen
+class _RenderFrame:
+    fibre_node: FibreNode
+    fibre_node_state: FibreNodeState
+    dot_node: pydot.Node
+    remaining_children: Iterator[FibreNode]
+    child_maximum_evaluation_depth: int
 
 
 def _default_skip_evaluation_predicate(_fibre_node: FibreNode) -> bool:
@@ -79,6 +130,8 @@ class DotRenderer:
     _graph: pydot.Dot = Factory(lambda: pydot.Dot("render", graph_type="digraph", ordering="out"))
 
     _dot_nodes: dict[FibreNode, pydot.Node] = Factory(dict)
+    # Labels keyed by id(props). Each entry holds a reference to its props so the id can't be reused while it's cached
+    _node_labels: dict[int, tuple[FibreNodeFunction, str]] = Factory(dict)
     _render_tree_position_dependency_edges: bool = False
 
     @staticmethod
@@ -103,23 +156,66 @@ class DotRenderer:
         return DotRenderer(skip_evaluation_predicate)
 
     def render_fibre_node(self, fibre_node: FibreNode, maximum_evaluation_depth: int = -1) -> pydot.Node:
-        if (dot_node := self._dot_nodes.get(fibre_node)) is not None:
+        # Rendered with an explicit stack rather than recursively so that deep trees can't exceed the recursion limit.
+        # Nodes and edges are added in the same order as a recursive depth-first traversal would add them.
+        dot_node, render_frame = self._start_rendering_fibre_node(fibre_node, maximum_evaluation_depth)
+        if render_frame is None:
             return dot_node
+
+        stack = [render_frame]
+        while stack:
+            render_frame = stack[-1]
+            child_fibre_node = next(render_frame.remaining_children, None)
+            if child_fibre_node is not None:
+                child_dot_node, child_render_frame = self._start_rendering_fibre_node(
+                    child_fibre_node, render_frame.child_maximum_evaluation_depth
+                )
+                if child_render_frame is not None:
+                    stack.append(child_render_frame)
+                else:
+                    self._add_child_edge(render_frame.dot_node, child_dot_node, child_fibre_node)
+                continue
+
+            stack.pop()
+            self._finish_rendering_fibre_node(render_frame)
+            if stack:
+                self._add_child_edge(stack[-1].dot_node, render_frame.dot_node, render_frame.fibre_node)
+
+        return dot_node
+
+    def _start_rendering_fibre_node(
+        self, fibre_node: FibreNode, maximum_evaluation_depth: int
+    ) -> tuple[pydot.Node, Optional[_RenderFrame]]:
+        if (dot_node := self._dot_nodes.get(fibre_node)) is not None:
+            return dot_node, None
         fibre_node_state = fibre_node.get_fibre_node_state()
-        label = NodeLabel.create(fibre_node_state.props) if fibre_node_state is not None else NodeLabel("<unevaluated>")
+        label = (
+            self._get_node_label(fibre_node_state.props) if fibre_node_state is not None else _UNEVALUATED_NODE_LABEL
+        )
         dot_node = pydot.Node(name=get_node_name(fibre_node.key_path), label=label, shape="plain")
         self._graph.add_node(dot_node)
         self._dot_nodes[fibre_node] = dot_node
 
         if fibre_node_state is None:
-            return dot_node
+            return dot_node, None
 
+        remaining_children: Iterator[FibreNode]
         if maximum_evaluation_depth == 0 or self._skip_evaluation_predicate(fibre_node):
             self._render_fields_as_children(dot_node, fibre_node_state.props, fibre_node.key_path)
+            remaining_children = iter(())
         else:
-            self._render_children(dot_node, fibre_node_state, maximum_evaluation_depth - 1)
+            remaining_children = iter(fibre_node_state.children)
 
-        for predecessor_fibre_node in fibre_node_state.predecessors:
+        return dot_node, _RenderFrame(
+            fibre_node, fibre_node_state, dot_node, remaining_children, maximum_evaluation_depth - 1
+        )
+
+    def _finish_rendering_fibre_node(self, render_frame: _RenderFrame) -> None:
+        dot_node = render_frame.dot_node
+        fibre_node_state = render_frame.fibre_node_state
+        # A node can depend on the same predecessor more than once (e.g. by using a context twice), but only one edge is
+        # drawn for each
+        for predecessor_fibre_node in dict.fromkeys(fibre_node_state.predecessors):
             predecessor_dot_node = self._dot_nodes.get(predecessor_fibre_node)
             if predecessor_dot_node is None:
                 continue
@@ -128,7 +224,7 @@ class DotRenderer:
             )
 
         if self._render_tree_position_dependency_edges:
-            for tree_structure_predecessor_fibre_node in fibre_node_state.tree_structure_predecessors:
+            for tree_structure_predecessor_fibre_node in dict.fromkeys(fibre_node_state.tree_structure_predecessors):
                 tree_structure_predecessor_dot_node = self._dot_nodes.get(tree_structure_predecessor_fibre_node)
                 if tree_structure_predecessor_dot_node is None:
                     continue
@@ -141,29 +237,21 @@ class DotRenderer:
                     )
                 )
 
-        return dot_node
-
-    def _render_children(
-        self, dot_node: pydot.Node, fibre_node_state: FibreNodeState, maximum_evaluation_depth: int
-    ) -> None:
-        for child_fibre_node in fibre_node_state.children:
-            child_dot_node = self.render_fibre_node(child_fibre_node, maximum_evaluation_depth)
-            self._graph.add_edge(
-                pydot.Edge(dot_node.get_name(), child_dot_node.get_name(), label=str(child_fibre_node.key))
-            )
+    def _add_child_edge(self, dot_node: pydot.Node, child_dot_node: pydot.Node, child_fibre_node: FibreNode) -> None:
+        self._graph.add_edge(
+            pydot.Edge(dot_node.get_name(), child_dot_node.get_name(), label=str(child_fibre_node.key))
+        )
 
     def _render_fields_as_children(self, dot_node: pydot.Node, props: PropsT, key_path: KeyPath) -> None:
         children: list[tuple[str, FibreNodeFunction]] = []
-        for field in cast(tuple[Attribute, ...], fields(type(props))):
+        for field in _get_field_descriptors(type(props)):
             field_value = getattr(props, field.name)
             if isinstance(field_value, FibreNodeFunction):
                 children.append((field.name, field_value))
-            elif isinstance(field_value, Mapping) and all(
-                isinstance(value, FibreNodeFunction) for value in field_value.values()
-            ):
-                children.extend((f"{field.name}.{key}", value) for key, value in field_value.items())
-            elif isinstance(field_value, Sequence) and all(isinstance(item, FibreNodeFunction) for item in field_value):
-                children.extend((f"{field.name}.{idx}", value) for idx, value in enumerate(field_value))
+            elif isinstance(field_value, Mapping):
+                _extend_with_props_items(children, field.name, field_value.items())
+            elif isinstance(field_value, Sequence):
+                _extend_with_props_items(children, field.name, enumerate(field_value))
 
         for child_key, child in children:
             child_dot_node = self.render_props(child, key_path=(*key_path, child_key))
@@ -171,11 +259,18 @@ class DotRenderer:
 
     def render_props(self, props: PropsT, key_path: KeyPath) -> pydot.Node:
         dot_node = pydot.Node(
-            name=get_node_name(key_path), label=NodeLabel.create(props), shape="plain", style="dashed"
+            name=get_node_name(key_path), label=self._get_node_label(props), shape="plain", style="dashed"
         )
         self._graph.add_node(dot_node)
         self._render_fields_as_children(dot_node, props, key_path)
         return dot_node
 
+    def _get_node_label(self, props: FibreNodeFunction) -> str:
+        if (cached_node_label := self._node_labels.get(id(props))) is not None:
+            return cached_node_label[1]
+        node_label = create_node_label(props)
+        self._node_labels[id(props)] = (props, node_label)
+        return node_label
+
     def get_dot(self) -> pydot.Dot:
         return self._graph
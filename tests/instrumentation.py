@@ -1,3 +1,4 @@
+from collections import Counter
 from typing import Collection, Optional
 
 from attr import Factory, field, mutable, setters
@@ -16,11 +17,16 @@ def to_frozenset(iterable: Collection[Key]) -> frozenset[Key]:
 class CallRecordingInstrumentation(FibreInstrumentation):
     known_keys: frozenset[Key] = field(converter=to_frozenset, on_setattr=setters.frozen)
     evaluations: list[KeyPath] = Factory(list)
+    # Unlike evaluations, repeated evaluations of the same node are all counted
+    evaluation_counts: Counter[KeyPath] = Factory(Counter)
 
     @override
     def on_node_evaluation_start(self, fibre_node: FibreNode) -> None:
         filtered_key_path = self._get_filtered_key_path(fibre_node)
-        if filtered_key_path is not None and (not self.evaluations or self.evaluations[-1] != filtered_key_path):
+        if filtered_key_path is None:
+            return
+        self.evaluation_counts[filtered_key_path] += 1
+        if not self.evaluations or self.evaluations[-1] != filtered_key_path:
             self.evaluations.append(filtered_key_path)
 
     @override
@@ -42,3 +48,4 @@ class CallRecordingInstrumentation(FibreInstrumentation):
 
     def reset(self) -> None:
         self.evaluations.clear()
+        self.evaluation_counts.clear()
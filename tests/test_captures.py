@@ -7,7 +7,7 @@ from pybt2.runtime.captures import OrderedCaptureProvider, UnorderedCaptureProvi
 from pybt2.runtime.fibre import CallContext, Fibre, FibreNode
 from pybt2.runtime.function_call import RuntimeCallableProps
 from pybt2.runtime.hooks import use_state
-from pybt2.runtime.types import CaptureKey
+from pybt2.runtime.types import CaptureKey, ContextKey
 from tests.instrumentation import CallRecordingInstrumentation
 from tests.utils import ReturnArgument, run_in_fibre
 
@@ -231,3 +231,11 @@ def test_ordered_capture(fibre: Fibre, root_fibre_node: FibreNode, test_instrume
         else [],
         ("capture-root",),
     )
+
+
+def test_capture_keys_compare_by_id():
+    assert CaptureKey[int]("TestCaptureKey") == IntCaptureKey
+    assert hash(CaptureKey[int]("TestCaptureKey")) == hash(IntCaptureKey)
+    assert CaptureKey[int]("OtherCaptureKey") != IntCaptureKey
+    assert CaptureKey[int].create_unique("TestCaptureKey") != CaptureKey[int].create_unique("TestCaptureKey")
+    assert ContextKey[int]("TestCaptureKey") != IntCaptureKey
@@ -2,6 +2,7 @@ from typing import Generic, Optional, TypeVar
 
 import pytest
 from attr import frozen
+from attr.exceptions import FrozenInstanceError
 
 from pybt2.runtime.contexts import ContextProvider, use_context
 from pybt2.runtime.fibre import CallContext, Fibre, FibreNode
@@ -200,3 +201,68 @@ def test_context_keys_use_identity_equality_when_created_via_unique():
 
     assert context_key_1 != context_key_2
     assert hash(context_key_1) != hash(context_key_2)
+
+
+def test_context_keys_are_immutable():
+    context_key = ContextKey[int]("context")
+
+    with pytest.raises(FrozenInstanceError):
+        context_key.id = "other"
+    assert context_key == ContextKey[int]("context")
+    assert hash(context_key) == hash(ContextKey[int]("context"))
+
+
+UnusedIntContextKey = ContextKey[int].create_unique("UnusedIntContextKey")
+OtherIntContextKey = ContextKey[int].create_unique("OtherIntContextKey")
+InnerIntContextKey = ContextKey[int].create_unique("InnerIntContextKey")
+
+
+@frozen
+class ConsumeOtherContextValueWhenEnabled(RuntimeCallableProps[Optional[int]]):
+    def __call__(self, ctx: CallContext) -> Optional[int]:
+        if use_context(ctx, IntContextKey) == 2:
+            return use_context(ctx, OtherIntContextKey)
+        return None
+
+
+def test_nested_contexts_see_contexts_changed_by_ancestors(fibre: Fibre, root_fibre_node: FibreNode):
+    # The inner provider is restored rather than re-evaluated when the context key provided above it changes, so the
+    # consumer beneath it must still see the newly provided context when it is next evaluated.
+    inner = ContextProvider(
+        key="inner",
+        context_key=InnerIntContextKey,
+        value=0,
+        child=ConsumeOtherContextValueWhenEnabled(key="consumer"),
+    )
+
+    @run_in_fibre(fibre, root_fibre_node)
+    def execute_1(ctx: CallContext) -> Optional[int]:
+        return ctx.evaluate_child(
+            ContextProvider(IntContextKey, 1, ContextProvider(UnusedIntContextKey, 3, inner), key="outer")
+        )
+
+    assert execute_1.result is None
+
+    @run_in_fibre(fibre, root_fibre_node, drain_work_queue=True)
+    def execute_2(ctx: CallContext) -> Optional[int]:
+        return ctx.evaluate_child(
+            ContextProvider(IntContextKey, 2, ContextProvider(OtherIntContextKey, 3, inner), key="outer")
+        )
+
+    consumer_state = root_fibre_node.get_fibre_node(("outer", 2, "inner", "consumer")).get_fibre_node_state()
+    assert consumer_state is not None
+    assert consumer_state.result == 3
+
+
+def test_children_with_no_additional_contexts_share_parent_contexts(fibre: Fibre, root_fibre_node: FibreNode):
+    @run_in_fibre(fibre, root_fibre_node)
+    def execute(ctx: CallContext):
+        ctx.evaluate_child(ReturnArgument(1), key="child", additional_contexts={})
+
+    assert root_fibre_node.get_fibre_node(("child",)).contexts is root_fibre_node.contexts
+
+
+def test_root_contexts_are_read_only(root_fibre_node: FibreNode):
+    with pytest.raises(TypeError):
+        root_fibre_node.contexts[IntContextKey] = root_fibre_node  # type: ignore[index]
+    assert IntContextKey not in root_fibre_node.contexts
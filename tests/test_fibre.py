@@ -1,11 +1,13 @@
 import pytest
+from attr.exceptions import FrozenInstanceError
 
 from pybt2.runtime.exceptions import ChildAlreadyExistsError, PropsTypeConflictError
 from pybt2.runtime.fibre import CallContext, Fibre, FibreNode
+from pybt2.runtime.hooks import use_state
 from pybt2.runtime.types import FibreNodeState
 
 from .instrumentation import CallRecordingInstrumentation
-from .utils import ReturnArgument, run_in_fibre
+from .utils import ExternalFunctionProps, ReturnArgument, run_in_fibre
 
 
 def test_evaluate_child(fibre: Fibre, root_fibre_node: FibreNode):
@@ -36,6 +38,18 @@ def test_evaluate_child_with_explicit_key(fibre: Fibre, root_fibre_node: FibreNo
     )
 
 
+def test_fibre_node_state_is_immutable(fibre: Fibre, root_fibre_node: FibreNode):
+    @run_in_fibre(fibre, root_fibre_node)
+    def execute(ctx: CallContext) -> int:
+        return ctx.evaluate_child(ReturnArgument(1), key="child")
+
+    fibre_node_state = root_fibre_node.get_fibre_node(("child",)).get_fibre_node_state()
+    assert fibre_node_state is not None
+    with pytest.raises(FrozenInstanceError):
+        fibre_node_state.result = 2
+    assert fibre_node_state.result == 1
+
+
 @pytest.mark.known_keys("child1", "child2")
 def test_can_change_child(fibre: Fibre, root_fibre_node: FibreNode, test_instrumentation: CallRecordingInstrumentation):
     @run_in_fibre(fibre, root_fibre_node)
@@ -67,6 +81,15 @@ def test_cannot_create_same_child_twice(fibre: Fibre, root_fibre_node: FibreNode
             ctx.evaluate_child(ReturnArgument(1), key="child")
 
 
+def test_cannot_reuse_automatically_generated_child_key(fibre: Fibre, root_fibre_node: FibreNode):
+    with pytest.raises(ChildAlreadyExistsError):
+
+        @run_in_fibre(fibre, root_fibre_node)
+        def execute(ctx: CallContext):
+            ctx.evaluate_child(ReturnArgument(1))
+            ctx.evaluate_child(ReturnArgument(1), key=1)
+
+
 def test_cannot_remove_successor_that_does_not_exist(fibre: Fibre, root_fibre_node: FibreNode):
     with pytest.raises(KeyError):
         root_fibre_node.remove_successor(root_fibre_node)
@@ -87,3 +110,79 @@ def test_cannot_get_child_node_that_doesnt_exist(fibre: Fibre, root_fibre_node:
 
     with pytest.raises(KeyError):
         root_fibre_node.get_fibre_node("bar")
+
+
+def test_removed_children_are_disposed_from_many_children(fibre: Fibre, root_fibre_node: FibreNode):
+    @run_in_fibre(fibre, root_fibre_node)
+    def execute_1(ctx: CallContext):
+        for idx in range(8):
+            ctx.evaluate_child(ReturnArgument(idx), key=f"child{idx}")
+
+    removed_child = root_fibre_node.get_fibre_node(("child7",))
+
+    @run_in_fibre(fibre, root_fibre_node)
+    def execute_2(ctx: CallContext):
+        for idx in range(7):
+            ctx.evaluate_child(ReturnArgument(idx), key=f"child{idx}")
+
+    assert removed_child.get_fibre_node_state() is None
+    with pytest.raises(KeyError):
+        root_fibre_node.get_fibre_node(("child7",))
+    assert root_fibre_node.get_fibre_node(("child6",)).get_fibre_node_state() is not None
+
+
+@pytest.mark.known_keys("outer", "inner", "inner_state")
+def test_drain_work_queue_runs_ancestors_before_descendants(
+    fibre: Fibre, root_fibre_node: FibreNode, test_instrumentation: CallRecordingInstrumentation
+):
+    def inner(ctx: CallContext) -> None:
+        use_state(ctx, 1, key="inner_state")
+
+    def outer(ctx: CallContext) -> None:
+        use_state(ctx, 1, key="outer_state")
+        ctx.evaluate_child(ExternalFunctionProps(inner), key="inner")
+
+    @run_in_fibre(fibre, root_fibre_node)
+    def execute(ctx: CallContext) -> None:
+        ctx.evaluate_child(ExternalFunctionProps(outer), key="outer")
+
+    test_instrumentation.reset()
+    inner_state_fibre_node = root_fibre_node.get_fibre_node(("outer", "inner", "inner_state"))
+    outer_state_fibre_node = root_fibre_node.get_fibre_node(("outer", "outer_state"))
+    inner_state_fibre_node_state = inner_state_fibre_node.get_fibre_node_state()
+    outer_state_fibre_node_state = outer_state_fibre_node.get_fibre_node_state()
+    assert inner_state_fibre_node_state is not None
+    assert outer_state_fibre_node_state is not None
+    _, set_inner_state = inner_state_fibre_node_state.result
+    _, set_outer_state = outer_state_fibre_node_state.result
+
+    # Schedule the descendant before the ancestor. Re-running the ancestor brings the descendant up to date, so the
+    # descendant must be skipped when it's popped from the work queue rather than being evaluated a second time.
+    set_inner_state(2)
+    set_outer_state(2)
+    fibre.drain_work_queue()
+
+    assert test_instrumentation.evaluation_counts[("outer", "inner", "inner_state")] == 1
+    if fibre.incremental:
+        # "inner" has unchanged props, so only its out-of-date state is evaluated, which then re-evaluates "inner"
+        test_instrumentation.assert_evaluations_and_reset(
+            ("outer",), ("outer", "inner", "inner_state"), ("outer", "inner")
+        )
+    else:
+        test_instrumentation.assert_evaluations_and_reset(
+            ("outer",), ("outer", "inner"), ("outer", "inner", "inner_state")
+        )
+
+
+def test_unchanged_evaluation_reuses_previous_state(fibre: Fibre, root_fibre_node: FibreNode):
+    child = ReturnArgument(1)
+
+    def execute(ctx: CallContext) -> int:
+        return ctx.evaluate_child(child, key="child")
+
+    props = ExternalFunctionProps(execute)
+    fibre_node_state_1 = fibre.run(root_fibre_node, props)
+    # Re-evaluates the whole tree when the fibre isn't incremental
+    fibre_node_state_2 = fibre.run(root_fibre_node, props)
+
+    assert fibre_node_state_2 is fibre_node_state_1
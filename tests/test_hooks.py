@@ -102,6 +102,74 @@ def test_setting_same_value_does_not_change_result_version(
     assert not root_fibre_node.is_out_of_date()
 
 
+@pytest.mark.known_keys("use_state")
+def test_enqueue_updates_applies_updates_in_order(
+    fibre: Fibre, root_fibre_node: FibreNode, test_instrumentation: CallRecordingInstrumentation
+):
+    @run_in_fibre(fibre, root_fibre_node)
+    def execute_1(ctx: CallContext) -> tuple[int, Setter[int]]:
+        return use_state(ctx, 1, key="use_state")
+
+    test_instrumentation.assert_evaluations_and_reset(("use_state",))
+
+    use_state_fibre_node = root_fibre_node.get_fibre_node(("use_state",))
+    use_state_fibre_node.enqueue_updates([increment, lambda value: value * 10, increment], fibre)
+    assert use_state_fibre_node.is_out_of_date()
+
+    fibre.drain_work_queue()
+
+    use_state_fibre_node_state = use_state_fibre_node.get_fibre_node_state()
+    assert use_state_fibre_node_state is not None
+    assert use_state_fibre_node_state.result[0] == 21
+    test_instrumentation.assert_evaluations_and_reset(("use_state",))
+
+
+@pytest.mark.known_keys("use_state")
+def test_enqueue_no_updates_does_not_schedule_evaluation(
+    fibre: Fibre, root_fibre_node: FibreNode, test_instrumentation: CallRecordingInstrumentation
+):
+    @run_in_fibre(fibre, root_fibre_node)
+    def execute_1(ctx: CallContext) -> tuple[int, Setter[int]]:
+        return use_state(ctx, 1, key="use_state")
+
+    test_instrumentation.assert_evaluations_and_reset(("use_state",))
+
+    use_state_fibre_node = root_fibre_node.get_fibre_node(("use_state",))
+    use_state_fibre_node.enqueue_updates(iter(()), fibre)
+    assert not use_state_fibre_node.is_out_of_date()
+
+    fibre.drain_work_queue()
+    test_instrumentation.assert_evaluations_and_reset()
+
+
+@pytest.mark.known_keys("use_state")
+def test_update_enqueued_during_evaluation_is_applied_once(
+    fibre: Fibre, root_fibre_node: FibreNode, test_instrumentation: CallRecordingInstrumentation
+):
+    @run_in_fibre(fibre, root_fibre_node)
+    def execute_1(ctx: CallContext) -> tuple[int, Setter[int]]:
+        return use_state(ctx, 1, key="use_state")
+
+    test_instrumentation.assert_evaluations_and_reset(("use_state",))
+    _, set_value = execute_1.result
+
+    def add_100_later(value: int) -> int:
+        set_value(lambda next_value: next_value + 100)
+        return value
+
+    set_value(add_100_later)
+    fibre.drain_work_queue()
+    test_instrumentation.assert_evaluations_and_reset(("use_state",))
+
+    # The update enqueued while evaluating is applied by the next evaluation, and only by that evaluation
+    @run_in_fibre(fibre, root_fibre_node)
+    def execute_2(ctx: CallContext) -> tuple[int, Setter[int]]:
+        return use_state(ctx, 1, key="use_state")
+
+    assert execute_2.result[0] == 101
+    test_instrumentation.assert_evaluations_and_reset(("use_state",))
+
+
 @pytest.mark.known_keys("use_state1", "use_state2")
 def test_multiple_children_and_can_reorder_preserving_state(
     fibre: Fibre, root_fibre_node: FibreNode, test_instrumentation: CallRecordingInstrumentation
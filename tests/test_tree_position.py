@@ -70,6 +70,22 @@ def test_can_calculate_tree_position(
     )
 
 
+def test_can_calculate_tree_position_among_many_children(fibre: Fibre, root_fibre_node: FibreNode):
+    @run_in_fibre(fibre, root_fibre_node)
+    def execute(ctx: CallContext):
+        ctx.evaluate_child(EvaluateChildren([ReturnArgument(i) for i in range(20)], key="evaluate-children"))
+        evaluate_children_node_state = ctx.get_last_child().get_fibre_node_state()
+        assert evaluate_children_node_state is not None
+        children = evaluate_children_node_state.children
+
+        positions = [
+            ctx.evaluate_child(ReturnTreePosition(child, None, key=f"tree-position-{index}"))
+            for index, child in reversed(list(enumerate(children)))
+        ]
+
+        assert positions == [(index,) for index in reversed(range(20))]
+
+
 @pytest.mark.known_keys(
     "evaluate-root",
     "evaluate-intermediate",
@@ -0,0 +1,52 @@
+from typing import Sequence
+
+from attr import frozen
+
+from pybt2.runtime.contexts import ContextProvider, use_context
+from pybt2.runtime.fibre import CallContext, Fibre, FibreNode
+from pybt2.runtime.function_call import RuntimeCallableProps
+from pybt2.runtime.types import ContextKey
+from pybt2.runtime.visualise import DotRenderer, create_node_label
+
+from .utils import ReturnArgument, run_in_fibre
+
+IntContextKey = ContextKey[int].create_unique("IntContextKey")
+
+
+@frozen
+class LabelledProps(RuntimeCallableProps[None]):
+    name: str
+    values: Sequence[int]
+    children: Sequence[ReturnArgument[int]]
+
+    def __call__(self, ctx: CallContext) -> None:
+        pass
+
+
+@frozen
+class UseContextTwice(RuntimeCallableProps[int]):
+    def __call__(self, ctx: CallContext) -> int:
+        return use_context(ctx, IntContextKey) + use_context(ctx, IntContextKey)
+
+
+def test_node_label_renders_scalar_fields_and_omits_props():
+    label = create_node_label(LabelledProps("a <name>", (1, 2), (ReturnArgument(1),)))
+
+    assert label.startswith("<")
+    assert label.endswith(">")
+    assert "<b>LabelledProps</b>" in label
+    assert "<i>name</i>=&#x27;a &lt;name&gt;&#x27;" in label
+    assert "<i>values</i>=(1, 2)" in label
+    assert "children" not in label
+
+
+def test_renders_one_edge_per_predecessor(fibre: Fibre, root_fibre_node: FibreNode):
+    @run_in_fibre(fibre, root_fibre_node)
+    def execute(ctx: CallContext) -> int:
+        return ctx.evaluate_child(ContextProvider(IntContextKey, 1, UseContextTwice(key="child")))
+
+    assert execute.result == 2
+    renderer = DotRenderer()
+    renderer.render_fibre_node(root_fibre_node)
+    predecessor_edges = [edge for edge in renderer.get_dot().get_edges() if edge.get("style") == "dashed"]
+    assert len(predecessor_edges) == 1